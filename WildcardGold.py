@@ -1,9 +1,15 @@
+import functools
 import os
-import re
+import sys
 import hashlib
 import random
-from dataclasses import dataclass
-from typing import Dict, List, Tuple, Optional
+import struct
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import Dict, Iterable, List, Tuple, Optional
 
 
 # -----------------------------
@@ -12,18 +18,112 @@ from typing import Dict, List, Tuple, Optional
 
 _WILDCARD_FILE_EXTS = {".txt"}
 
-# Supports <color> and <object|person> and <obj/person|thing/stuff>
-_TOKEN_RE = re.compile(r"<\s*([A-Za-z0-9_\-./|: \t]+?)\s*>")
+# missing_policy resolved once per expansion to an int flag; int compares
+# per token are cheaper than repeated string compares.
+_POLICY_KEEP = 0
+_POLICY_EMPTY = 1
+_POLICY_ERROR = 2
+_POLICY_FLAGS = {"keep": _POLICY_KEEP, "empty": _POLICY_EMPTY, "error": _POLICY_ERROR}
+
+# Characters permitted inside a <...> token: letters, digits, and the
+# separators used by <obj/person|thing:1> style tokens (plus space/tab).
+_TOKEN_CHARS = frozenset(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-./|: \t"
+)
+
+
+def _iter_tokens(text: str):
+    """Yield (start, end, raw) for every <...> wildcard token in `text`.
+
+    Hand-rolled scanner replacing the old regex: str.find and frozenset
+    membership both run at C level, so scanning costs no per-character
+    Python work. `raw` is the inner text with surrounding whitespace
+    stripped. A candidate whose inner text contains characters outside
+    _TOKEN_CHARS is not a token, and scanning resumes at the next '<'
+    inside it — so '<<color>' still finds '<color>', matching the regex.
+    """
+    find = text.find
+    i = find("<")
+    while i != -1:
+        j = find(">", i + 1)
+        if j == -1:
+            return
+        raw = text[i + 1 : j].strip()
+        if raw and _TOKEN_CHARS.issuperset(raw):
+            yield i, j + 1, raw
+            i = find("<", j + 1)
+        else:
+            i = find("<", i + 1)
+
+class _LazyOptions:
+    """Option lines for one wildcard key, read from disk on first use.
+
+    _load_wildcards only records file paths during the traversal; the
+    lines are read, stripped and interned the first time a template
+    actually references the key, then cached. A basename alias can wrap
+    several paths: a single path keeps duplicate lines (preserving their
+    weight), merged paths are deduped in path order, matching the old
+    eager merge.
+    """
+
+    __slots__ = ("_paths", "_options")
+
+    def __init__(self, path: str):
+        self._paths = [path]
+        self._options: Optional[Tuple[str, ...]] = None
+
+    def add_path(self, path: str) -> None:
+        self._paths.append(path)
+        self._options = None
+
+    def options(self) -> Tuple[str, ...]:
+        if self._options is None:
+            lines: List[str] = []
+            for path in self._paths:
+                try:
+                    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                        data = f.read()
+                except OSError:
+                    continue
+                # Strip and drop empty lines in a single pass over the data.
+                # sys.intern makes lines duplicated across files share one str.
+                lines.extend(sys.intern(s) for s in (ln.strip() for ln in data.split("\n")) if s)
+            if len(self._paths) > 1:
+                lines = list(dict.fromkeys(lines))
+            self._options = tuple(lines)
+        return self._options
+
 
 @dataclass
 class _WildcardCache:
     signature: str
-    mapping: Dict[str, List[str]]
+    fast_stamp: Tuple[Tuple[str, str, int, int], ...]
+    dir_stamp: Tuple[Tuple[str, int], ...]
+    mapping: Dict[str, _LazyOptions]
     base_dirs: List[str]
+    # Lazily filled per observed keys-tuple: the option tables of the keys
+    # that actually exist, so repeated tokens skip per-occurrence mapping
+    # lookups. Rebuilt naturally when the wildcard files change because a
+    # fresh _WildcardCache is created.
+    group_cache: Dict[Tuple[str, ...], Tuple[Tuple[str, ...], ...]] = field(default_factory=dict)
 
 
 _CACHE: Optional[_WildcardCache] = None
 
+# The ComfyUI root and the set of custom_wildcards dirs never change during a
+# process lifetime, so resolve them once instead of re-walking parents and
+# custom_nodes/ on every _get_cache() call.
+_COMFY_ROOT: Optional[str] = None
+_BASE_DIRS: Optional[List[str]] = None
+
+
+def _invalidate_paths() -> None:
+    """Reset memoized path discovery (for tests)."""
+    global _COMFY_ROOT, _BASE_DIRS, _CACHE
+    _COMFY_ROOT = None
+    _BASE_DIRS = None
+    _CACHE = None
+
 
 def _comfy_root_from_here() -> str:
     """Best-effort detection of the ComfyUI root directory.
@@ -90,137 +190,351 @@ def _find_custom_wildcards_dirs(comfy_root: str) -> List[str]:
     return out
 
 
-def _wildcards_signature(base_dirs: List[str]) -> str:
+def _iter_txt_files(
+    base: str,
+    dir_stamps: Optional[List[Tuple[str, int]]] = None,
+    _rel_prefix: str = "",
+):
+    """Yield (path, relpath, stat_result) for every .txt file under `base`.
+
+    Uses os.scandir instead of os.walk so directory-ness and stat info come
+    from the directory read itself (PEP 471), halving syscalls on the hot
+    signature path. Hidden dirs and __pycache__ are skipped; entries are
+    visited in sorted name order so results are deterministic.
+
+    `relpath` is '/'-separated and built incrementally while recursing, so
+    callers don't need os.path.relpath per file. If `dir_stamps` is given,
+    (path, mtime_ns) of every visited directory is appended to it so
+    callers can record the tree structure in one traversal.
     """
-    Hash (path, mtime_ns, size) for all .txt files under all base dirs.
+    try:
+        entries = sorted(os.scandir(base), key=lambda e: e.name)
+    except OSError:
+        return
+    for entry in entries:
+        name = entry.name
+        if name.startswith("."):
+            continue
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if name != "__pycache__":
+                    if dir_stamps is not None:
+                        dir_stamps.append((entry.path, entry.stat().st_mtime_ns))
+                    child_prefix = _rel_prefix + name + "/"
+                    yield from _iter_txt_files(entry.path, dir_stamps, child_prefix)
+                continue
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            if name[-4:].lower() not in _WILDCARD_FILE_EXTS:
+                continue
+            yield entry.path, _rel_prefix + name, entry.stat()
+        except OSError:
+            continue
+
+
+def _wildcards_stamp(
+    base_dirs: List[str],
+) -> Tuple[Tuple[Tuple[str, str, int, int], ...], Tuple[Tuple[str, int], ...]]:
     """
-    h = hashlib.sha256()
+    Collect two stamps in one traversal, in deterministic order:
+      - file stamp: (base, relpath, mtime_ns, size) of every .txt file
+      - dir stamp: (path, mtime_ns) of every directory (-1 for base dirs
+        that do not currently exist, so their appearance is detected)
+
+    The file stamp is the cheap first-phase change check: comparing it with
+    `==` against the cached stamp is much faster than hashing, so the hash
+    signature only needs to be recomputed when the stamp actually differs.
+    The dir stamp lets steady-state calls skip directory enumeration
+    entirely (see _get_cache).
+    """
+    files: List[Tuple[str, str, int, int]] = []
+    dirs: List[Tuple[str, int]] = []
     for base in sorted(base_dirs):
-        if not os.path.isdir(base):
+        try:
+            base_mtime = os.stat(base).st_mtime_ns
+        except OSError:
+            dirs.append((base, -1))
             continue
-        for root, subdirs, files in os.walk(base):
-            subdirs[:] = [d for d in subdirs if not d.startswith(".") and d not in ("__pycache__",)]
-            for fn in sorted(files):
-                ext = os.path.splitext(fn)[1].lower()
-                if ext not in _WILDCARD_FILE_EXTS:
-                    continue
-                path = os.path.join(root, fn)
-                try:
-                    st = os.stat(path)
-                except OSError:
-                    continue
-                rel = os.path.relpath(path, base).replace("\\", "/")
-                h.update(base.encode("utf-8", "ignore"))
-                h.update(b"\0")
-                h.update(rel.encode("utf-8", "ignore"))
-                h.update(b"\0")
-                h.update(str(st.st_mtime_ns).encode("utf-8"))
-                h.update(b"\0")
-                h.update(str(st.st_size).encode("utf-8"))
-                h.update(b"\0")
+        dirs.append((base, base_mtime))
+        for _path, rel, st in _iter_txt_files(base, dirs):
+            files.append((base, rel, st.st_mtime_ns, st.st_size))
+    return tuple(files), tuple(dirs)
+
+
+def _dir_stamp_current(dir_stamp: Tuple[Tuple[str, int], ...]) -> bool:
+    """True if no directory in the stamp gained/lost/renamed entries.
+
+    A directory's own mtime_ns changes when entries are added, removed or
+    renamed, so an unchanged dir stamp means the set of files is unchanged.
+    It says nothing about file *contents* — in-place edits bump only the
+    file's mtime — so callers must still stat the files themselves.
+    """
+    for path, mtime_ns in dir_stamp:
+        if mtime_ns == -1:
+            if os.path.isdir(path):
+                return False
+            continue
+        try:
+            if os.stat(path).st_mtime_ns != mtime_ns:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def _restat_stamp(
+    fast_stamp: Tuple[Tuple[str, str, int, int], ...],
+) -> Optional[Tuple[Tuple[str, str, int, int], ...]]:
+    """Rebuild a file stamp by statting the known file paths directly.
+
+    Only valid when _dir_stamp_current() confirmed the file set is
+    unchanged; returns None if a file vanished anyway (race), signalling
+    the caller to fall back to a full traversal.
+    """
+    out: List[Tuple[str, str, int, int]] = []
+    for base, rel, _mtime_ns, _size in fast_stamp:
+        try:
+            st = os.stat(base + "/" + rel)
+        except OSError:
+            return None
+        out.append((base, rel, st.st_mtime_ns, st.st_size))
+    return tuple(out)
+
+
+def _wildcards_signature(stamp: Tuple[Tuple[str, str, int, int], ...]) -> str:
+    """
+    Hash (path, mtime_ns, size) of every .txt file, from a collected stamp.
+
+    Uses BLAKE2b (faster than SHA-256, still cryptographic; 16 bytes is
+    plenty for cache identity) and packs each file's fields into a single
+    update call instead of eight.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    prev_base = None
+    for base, rel, mtime_ns, size in stamp:
+        if base != prev_base:
+            # Stamp entries are grouped by base dir; encode each base once
+            # instead of once per file.
+            h.update(base.encode("utf-8", "ignore") + b"\0")
+            prev_base = base
+        h.update(
+            rel.encode("utf-8", "ignore")
+            + b"\0"
+            + struct.pack("<QQ", mtime_ns & 0xFFFFFFFFFFFFFFFF, size)
+        )
     return h.hexdigest()
 
 
-def _load_wildcards(base_dirs: List[str]) -> Dict[str, List[str]]:
+def _load_wildcards(base_dirs: List[str]) -> Dict[str, _LazyOptions]:
     """
     Builds mapping (all keys are lowercase):
       - full relpath without extension: 'obj/person' -> lines from obj/person.txt
       - basename alias for convenience: 'person' -> lines from obj/person.txt
 
-    If multiple files share the same basename (e.g. a/person.txt and b/person.txt),
-    the basename alias list is merged (deduped, stable order).
+    Values are _LazyOptions: only file paths are recorded here, and no file
+    is read until a template actually references its key. If multiple files
+    share the same basename (e.g. a/person.txt and b/person.txt), the
+    basename alias reads all of them (deduped, stable order).
     """
-    mapping: Dict[str, List[str]] = {}
+    mapping: Dict[str, _LazyOptions] = {}
+    alias_paths: Dict[str, List[str]] = {}
 
     for base in base_dirs:
-        if not os.path.isdir(base):
-            continue
-
-        for root, subdirs, files in os.walk(base):
-            subdirs[:] = [d for d in subdirs if not d.startswith(".") and d not in ("__pycache__",)]
-            for fn in files:
-                ext = os.path.splitext(fn)[1].lower()
-                if ext not in _WILDCARD_FILE_EXTS:
-                    continue
-
-                full = os.path.join(root, fn)
-                rel = os.path.relpath(full, base).replace("\\", "/")
-                key = os.path.splitext(rel)[0].lower()  # full relpath key, drop .txt
-                base_key = os.path.splitext(os.path.basename(rel))[0].lower()  # basename alias
-
-                try:
-                    with open(full, "r", encoding="utf-8", errors="ignore") as f:
-                        lines = [ln.strip() for ln in f.read().splitlines()]
-                except OSError:
-                    continue
+        for full, rel, _st in _iter_txt_files(base):
+            key = rel[:-4].lower()  # full relpath key; rel always ends in .txt
+            slash = rel.rfind("/")
+            base_key = key if slash == -1 else rel[slash + 1 : -4].lower()  # basename alias
+
+            # Full relpath mapping (obj/person)
+            mapping[key] = _LazyOptions(full)
+
+            # Collected for the alias pass below.
+            if base_key and base_key != key:
+                alias_paths.setdefault(base_key, []).append(full)
+
+    # Basename alias mapping (person) so `<person>` works even if the file is in
+    # a subdir. Built after the walk so the result does not depend on traversal
+    # order: a full-key assignment can never clobber an alias recorded earlier.
+    for base_key, paths in alias_paths.items():
+        existing = mapping.get(base_key)
+        if existing is None:
+            alias = _LazyOptions(paths[0])
+            for p in paths[1:]:
+                alias.add_path(p)
+            mapping[base_key] = alias
+        else:
+            # A top-level <base_key>.txt also exists; its name IS the alias
+            # name, so replace the entry with a fresh merged object — the
+            # top-level file's lines first, then the subdir ones, matching
+            # the old eager merge.
+            merged = _LazyOptions(existing._paths[0])
+            for p in paths:
+                merged.add_path(p)
+            mapping[base_key] = merged
 
-                options = [ln for ln in lines if ln.strip() != ""]
-                if not options:
-                    continue
+    return mapping
 
-                # Full relpath mapping (obj/person)
-                mapping[key] = options
 
-                # Basename alias mapping (person) so `<person>` works even if the file is in a subdir.
-                # If multiple files share the same basename, merge (dedupe) into the alias list.
-                if base_key and base_key != key:
-                    if base_key not in mapping:
-                        mapping[base_key] = list(options)
-                    else:
-                        existing = mapping[base_key]
-                        for opt in options:
-                            if opt not in existing:
-                                existing.append(opt)
+def _get_cache() -> _WildcardCache:
+    global _CACHE, _COMFY_ROOT, _BASE_DIRS
+    if _COMFY_ROOT is None:
+        _COMFY_ROOT = _comfy_root_from_here()
+    if _BASE_DIRS is None:
+        _BASE_DIRS = _find_custom_wildcards_dirs(_COMFY_ROOT)
+    base_dirs = _BASE_DIRS
+
+    stamp = None
+    dir_stamp = None
+    if _CACHE is not None and _dir_stamp_current(_CACHE.dir_stamp):
+        # Tree structure unchanged: stat the known files directly instead of
+        # re-enumerating directories. Edits still show up via file mtimes.
+        stamp = _restat_stamp(_CACHE.fast_stamp)
+        if stamp == _CACHE.fast_stamp:
+            return _CACHE
+        dir_stamp = _CACHE.dir_stamp
+
+    if stamp is None:
+        stamp, dir_stamp = _wildcards_stamp(base_dirs)
+        if _CACHE is not None and _CACHE.fast_stamp == stamp:
+            # Same files after a structural no-op (e.g. dir mtime touched);
+            # refresh the dir stamp but keep the loaded mapping.
+            _CACHE.dir_stamp = dir_stamp
+            return _CACHE
+
+    sig = _wildcards_signature(stamp)
+    mapping = _load_wildcards(base_dirs)
+    _CACHE = _WildcardCache(
+        signature=sig,
+        fast_stamp=stamp,
+        dir_stamp=dir_stamp,
+        mapping=mapping,
+        base_dirs=base_dirs,
+    )
+    return _CACHE
 
-    return mapping
 
+def _resolve_group(
+    keys: Tuple[str, ...],
+    mapping: Dict[str, _LazyOptions],
+) -> Tuple[Tuple[str, ...], ...]:
+    """Materialize the option tables for the keys that exist.
 
-def _get_cache() -> _WildcardCache:
-    global _CACHE
-    comfy_root = _comfy_root_from_here()
-    base_dirs = _find_custom_wildcards_dirs(comfy_root)
-    sig = _wildcards_signature(base_dirs)
+    Keys whose files turn out to hold no non-empty lines are dropped here,
+    so they behave as missing — same as when loading was eager.
+    """
+    out: List[Tuple[str, ...]] = []
+    for k in keys:
+        lazy = mapping.get(k)
+        if lazy is not None:
+            opts = lazy.options()
+            if opts:
+                out.append(opts)
+    return tuple(out)
 
-    if _CACHE is not None and _CACHE.signature == sig:
-        return _CACHE
 
-    mapping = _load_wildcards(base_dirs)
-    _CACHE = _WildcardCache(signature=sig, mapping=mapping, base_dirs=base_dirs)
-    return _CACHE
+def _pending_bindings(
+    text: str,
+    mapping: Dict[str, _LazyOptions],
+    groups: Dict[Tuple[str, ...], Tuple[Tuple[str, ...], ...]],
+    rng: random.Random,
+    bindings: Dict[Tuple[str, str], str],
+    guard: frozenset,
+) -> List[Tuple[Tuple[str, str], str]]:
+    """Collect bound tokens in `text` that have no binding yet.
+
+    Draws the (file, line) choice for each up front and returns
+    [(bind_key, chosen_line)] so the caller can expand the chosen lines as
+    explicit work items instead of recursing. Bind keys already in `guard`
+    (self-referential wildcards) are bound to the raw chosen line to cut
+    the cycle; tokens whose keys are all missing are left for
+    _expand_once's missing policy.
+    """
+    pending: List[Tuple[Tuple[str, str], str]] = []
+    if "<" not in text:
+        return pending
+    choice = rng.choice
+    seen: set = set()
+    for _start, _end, raw in _iter_tokens(text):
+        if raw.lower().startswith("lora:"):
+            continue
+        keys_part, var_id = _split_token_and_var(raw)
+        if var_id is None:
+            continue
+        keys = _parse_token_keys(keys_part)
+        group_id = "|".join(keys) if keys else ""
+        bind_key = (group_id, var_id)
+        if bind_key in bindings or bind_key in seen:
+            continue
+        group_opts = groups.get(keys)
+        if group_opts is None:
+            group_opts = _resolve_group(keys, mapping)
+            groups[keys] = group_opts
+        if not group_opts:
+            continue
+        options = group_opts[0] if len(group_opts) == 1 else choice(group_opts)
+        line = options[0] if len(options) == 1 else choice(options)
+        if bind_key in guard:
+            bindings[bind_key] = line
+        else:
+            seen.add(bind_key)
+            pending.append((bind_key, line))
+    return pending
 
 
 def _expand_fragment(
     fragment: str,
-    mapping: Dict[str, List[str]],
+    mapping: Dict[str, _LazyOptions],
+    groups: Dict[Tuple[str, ...], Tuple[Tuple[str, ...], ...]],
     rng: random.Random,
-    missing_policy: str,
+    policy: int,
     max_passes: int,
-    in_progress: set,
+    guard: frozenset,
 ) -> str:
-    """Expand a fragment (chosen wildcard line) to a final string.
-
-    Uses local bindings so anchors inside the wildcard line do NOT leak globally,
-    while still being consistent within that fragment.
+    """Expand a fragment (template or chosen wildcard line) to a final string.
+
+    Each fragment gets its own bindings dict so anchors inside a wildcard
+    line do NOT leak globally, while staying consistent within that
+    fragment.
+
+    Expansion runs as an explicit LIFO worklist instead of recursing
+    through bound tokens: before each pass, _pending_bindings drains the
+    frame's unresolved <name:1> tokens into child frames, which are fully
+    expanded (children first) and write their result into the parent's
+    bindings; the parent then re-runs without having consumed a pass.
+    Cycle detection rides along as a frozenset per frame rather than a
+    mutable set maintained around every recursive call.
     """
-    local_bindings: Dict[Tuple[str, str], str] = {}
-    text = fragment
     passes = max(1, int(max_passes))
-    for _ in range(passes):
-        text2, changed = _expand_once(
-            text,
-            mapping,
-            rng,
-            missing_policy,
-            local_bindings,
-            max_passes,
-            in_progress,
-        )
-        text = text2
-        if not changed:
-            break
-    return text
+    result = fragment
+    # Frame: [bind_key, text, bindings, passes_left, guard, parent_bindings]
+    stack: deque = deque()
+    stack.append([None, fragment, {}, passes, guard, None])
+    while stack:
+        frame = stack.pop()
+        bind_key, text, bindings, passes_left, fguard, parent = frame
+        pending = _pending_bindings(text, mapping, groups, rng, bindings, fguard)
+        if pending:
+            # Children are pushed after the frame, so they resolve first;
+            # the frame then re-runs this pass with its bindings filled in.
+            stack.append(frame)
+            for key, line in pending:
+                stack.append([key, line, {}, passes, fguard | {key}, bindings])
+            continue
+        text, changed = _expand_once(text, mapping, groups, rng, policy, bindings)
+        passes_left -= 1
+        if changed and passes_left > 0 and "<" in text:
+            frame[1] = text
+            frame[3] = passes_left
+            stack.append(frame)
+            continue
+        if parent is None:
+            result = text
+        else:
+            parent[bind_key] = text
+    return result
 
 
+@functools.lru_cache(maxsize=4096)
 def _split_token_and_var(raw: str) -> Tuple[str, Optional[str]]:
     """Split '<...>' inner text into (keys_part, var_id).
 
@@ -229,6 +543,9 @@ def _split_token_and_var(raw: str) -> Tuple[str, Optional[str]]:
       <object|person:2>
 
     Only treats the suffix as a var if it is all digits.
+
+    Pure function of the raw string, so results are memoized — repeated
+    tokens (within a template and across passes) cost a dict lookup.
     """
     raw = (raw or "").strip()
     if ":" not in raw:
@@ -240,9 +557,13 @@ def _split_token_and_var(raw: str) -> Tuple[str, Optional[str]]:
     return raw, None
 
 
-def _parse_token_keys(raw: str) -> List[str]:
+@functools.lru_cache(maxsize=4096)
+def _parse_token_keys(raw: str) -> Tuple[str, ...]:
     """
-    '<object|person>' -> ['object', 'person'] (lowercased, stripped)
+    '<object|person>' -> ('object', 'person') (lowercased, stripped)
+
+    Memoized like _split_token_and_var; the tuple return keeps the cached
+    value immutable.
     """
     parts = [p.strip() for p in raw.split("|")]
     keys = [p.lower() for p in parts if p != ""]
@@ -253,34 +574,45 @@ def _parse_token_keys(raw: str) -> List[str]:
         if k not in seen:
             seen.add(k)
             out.append(k)
-    return out
+    return tuple(out)
 
 
 def _expand_once(
     text: str,
-    mapping: Dict[str, List[str]],
+    mapping: Dict[str, _LazyOptions],
+    groups: Dict[Tuple[str, ...], Tuple[Tuple[str, ...], ...]],
     rng: random.Random,
-    missing_policy: str,
+    policy: int,
     bindings: Dict[Tuple[str, str], str],
-    max_passes: int,
-    in_progress: set,
 ) -> Tuple[str, bool]:
     """
     Returns (new_text, changed).
-    missing_policy: 'keep' | 'empty' | 'error'
+    policy: one of the _POLICY_* flags.
     """
-    changed = False
+    if "<" not in text:
+        return text, False
 
-    def repl(m: re.Match) -> str:
-        nonlocal changed
-        raw = m.group(1)
-        if raw.strip().lower().startswith("lora:"):
-            return m.group(0)
+    changed = False
+    pieces: List[str] = []
+    last = 0
+    choice = rng.choice  # bind once; called up to twice per token below
+
+    for start, end, raw in _iter_tokens(text):
+        pieces.append(text[last:start])
+        token_text = text[start:end]
+        last = end
+        if raw.lower().startswith("lora:"):
+            pieces.append(token_text)
+            continue
         keys_part, var_id = _split_token_and_var(raw)
         keys = _parse_token_keys(keys_part)
 
-        # Filter to keys that exist
-        existing = [k for k in keys if k in mapping]
+        # Option tables for the keys that exist, resolved once per
+        # keys-tuple and reused across occurrences and passes.
+        group_opts = groups.get(keys)
+        if group_opts is None:
+            group_opts = _resolve_group(keys, mapping)
+            groups[keys] = group_opts
 
         # Variable binding: if var_id is set, reuse the same (chosen_key, line)
         # for the same token-group across the whole expansion run.
@@ -289,50 +621,34 @@ def _expand_once(
 
         if bind_key is not None and bind_key in bindings:
             changed = True
-            return bindings[bind_key]
+            pieces.append(bindings[bind_key])
+            continue
 
-        if not existing:
-            if missing_policy == "empty":
+        if not group_opts:
+            if policy == _POLICY_EMPTY:
                 changed = True
-                return ""
-            if missing_policy == "error":
+                pieces.append("")
+            elif policy == _POLICY_ERROR:
                 looked_for = ", ".join([f"'{k}.txt'" for k in keys]) if keys else "(empty token)"
                 raise ValueError(f"Wildcard <{raw}> not found (looked for {looked_for} under custom_wildcards)")
-            return m.group(0)  # keep
+            else:
+                pieces.append(token_text)  # keep
+            continue
 
         # Choose which wildcard file to use, then choose a line from it
-        chosen_key = rng.choice(existing)
-        options = mapping[chosen_key]
-        chosen_line = rng.choice(options)
+        # (two-stage so each file stays equally likely regardless of size).
+        # Single-element fast paths skip the rng call entirely.
+        # Bound tokens never reach this point: _pending_bindings resolves
+        # them before each pass, so any binding is already in `bindings`.
+        options = group_opts[0] if len(group_opts) == 1 else choice(group_opts)
+        chosen_line = options[0] if len(options) == 1 else choice(options)
         changed = True
+        pieces.append(chosen_line)
 
-        # If bound, expand the chosen line immediately and cache the final expanded string.
-        if bind_key is not None:
-            if bind_key in in_progress:
-                # Prevent infinite recursion (e.g., wildcard line references itself).
-                bindings[bind_key] = chosen_line
-                return chosen_line
-
-            in_progress.add(bind_key)
-            try:
-                expanded = _expand_fragment(
-                    chosen_line,
-                    mapping,
-                    rng,
-                    missing_policy,
-                    max_passes,
-                    in_progress,
-                )
-            finally:
-                in_progress.discard(bind_key)
-
-            bindings[bind_key] = expanded
-            return expanded
-
-        return chosen_line
-
-    out = _TOKEN_RE.sub(repl, text)
-    return out, changed
+    if last == 0:
+        return text, changed
+    pieces.append(text[last:])
+    return "".join(pieces), changed
 
 
 def wildcard_expand(
@@ -341,19 +657,110 @@ def wildcard_expand(
     max_passes: int,
     missing_policy: str,
 ) -> str:
+    # No token can possibly match, so don't pay for the wildcard-tree scan.
+    if "<" not in template:
+        return template
+
     cache = _get_cache()
-    text = template
-    bindings: Dict[Tuple[str, str], str] = {}
-    in_progress: set = set()
+    return _expand_fragment(
+        template,
+        cache.mapping,
+        cache.group_cache,
+        rng,
+        _POLICY_FLAGS.get(missing_policy, _POLICY_KEEP),
+        max_passes,
+        frozenset(),
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _expand_cached(
+    template: str,
+    seed: int,
+    max_passes: int,
+    missing_policy: str,
+    cache_sig: str,
+) -> str:
+    """Expansion memoized on the full deterministic input tuple.
 
-    passes = max(1, int(max_passes))
-    for _ in range(passes):
-        text2, changed = _expand_once(text, cache.mapping, rng, missing_policy, bindings, passes, in_progress)
-        text = text2
-        if not changed:
-            break
+    ComfyUI re-invokes nodes whenever any upstream input changes, so the
+    exact same (template, seed, ...) is often recomputed; with a fixed
+    seed the result only depends on the arguments. `cache_sig` is the
+    wildcard tree signature, so file edits invalidate entries naturally.
+    """
+    return wildcard_expand(template, random.Random(seed), max_passes, missing_policy)
+
+
+# Below this many seeds a serial loop beats paying process startup.
+_POOL_MIN_BATCH = 8
+
+
+def _fork_context():
+    """Return the 'fork' multiprocessing context, or None when unavailable.
 
-    return text
+    Workers must inherit this module via fork: ComfyUI loads custom nodes
+    by file location, so the module name the parent registered is not
+    importable from a fresh (spawned) interpreter and unpickling the
+    worker function would fail before it ever runs. No fork (Windows)
+    means no pool — callers expand serially instead.
+    """
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    try:
+        return multiprocessing.get_context("fork")
+    except ValueError:
+        return None
+
+
+def _expand_seed(template: str, seed: int, max_passes: int, missing_policy: str) -> str:
+    """Expand one template with a fresh seeded rng (picklable pool worker)."""
+    return wildcard_expand(template, random.Random(seed), max_passes, missing_policy)
+
+
+def wildcard_expand_many(
+    template: str,
+    seeds: Iterable[int],
+    max_passes: int,
+    missing_policy: str,
+) -> List[str]:
+    """Expand the same template once per seed.
+
+    Small batches run serially; large ones fan out across a fork-based
+    process pool whose workers inherit the loaded wildcard cache
+    copy-on-write. Where fork is unavailable (Windows) or the pool fails,
+    the batch degrades to the serial loop rather than raising.
+    """
+    seeds = list(seeds)
+    if "<" not in template:
+        return [template] * len(seeds)
+
+    ctx = _fork_context()
+    if len(seeds) < _POOL_MIN_BATCH or ctx is None:
+        return [_expand_seed(template, s, max_passes, missing_policy) for s in seeds]
+
+    # Warm the parent cache first so forked workers inherit it for free.
+    _get_cache()
+    workers = min(os.cpu_count() or 1, len(seeds))
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as executor:
+            return list(
+                executor.map(
+                    _expand_seed,
+                    repeat(template),
+                    seeds,
+                    repeat(max_passes),
+                    repeat(missing_policy),
+                    chunksize=max(1, len(seeds) // workers),
+                )
+            )
+    except ValueError:
+        # Expansion errors (missing_policy == 'error') surface as-is above;
+        # they are deterministic, so no point retrying serially.
+        raise
+    except Exception:
+        # A broken pool (e.g. sandboxed environment, killed worker) should
+        # not take the node down — redo the batch serially.
+        return [_expand_seed(template, s, max_passes, missing_policy) for s in seeds]
 
 
 # -----------------------------
@@ -379,28 +786,50 @@ class WildcardGold:
                 "max_passes": ("INT", {"default": 3, "min": 1, "max": 50}),
                 "missing_policy": (["keep", "empty", "error"],),
                 "seed": ("INT", {"default": 0, "min": 0, "max": 0xFFFFFFFFFFFFFFFF}),
-            }
+            },
+            "optional": {
+                "batch_size": ("INT", {"default": 1, "min": 1, "max": 1024}),
+            },
         }
 
     @classmethod
-    def IS_CHANGED(cls, template, max_passes, missing_policy, seed):
-        cache = _get_cache()
-        return (
+    def IS_CHANGED(cls, template, max_passes, missing_policy, seed, batch_size=1):
+        base = (
             template,
             int(max_passes),
             str(missing_policy),
             int(seed) & 0xFFFFFFFFFFFFFFFF,
-            cache.signature,
+            int(batch_size),
         )
+        # Without any '<' the wildcard files cannot affect the output, so
+        # skip the tree scan and leave the signature out of the tuple.
+        if "<" not in template:
+            return base
+        return base + (_get_cache().signature,)
 
-    def compute(self, template, max_passes, missing_policy, seed):
+    def compute(self, template, max_passes, missing_policy, seed, batch_size=1):
         used_seed = int(seed) & 0xFFFFFFFFFFFFFFFF
 
-        rng = random.Random(used_seed)
-        out = wildcard_expand(
-            template=template,
-            rng=rng,
-            max_passes=max_passes,
-            missing_policy=missing_policy,
+        if int(batch_size) > 1:
+            # One expansion per consecutive seed, joined as one prompt per line.
+            seeds = [(used_seed + i) & 0xFFFFFFFFFFFFFFFF for i in range(int(batch_size))]
+            outs = wildcard_expand_many(
+                template=template,
+                seeds=seeds,
+                max_passes=max_passes,
+                missing_policy=missing_policy,
+            )
+            return ("\n".join(outs),)
+
+        # No token: skip both the tree scan and the result cache.
+        if "<" not in template:
+            return (template,)
+
+        out = _expand_cached(
+            template,
+            used_seed,
+            int(max_passes),
+            str(missing_policy),
+            _get_cache().signature,
         )
         return (out,)